@@ -1,14 +1,19 @@
 """Helpers for consuming Death Stranding chunk-table breakdowns."""
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Mapping, MutableMapping, Optional, Sequence
+from typing import Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 from uuid import UUID
 
+try:  # orjson parses straight from bytes and is much faster on large sidecars
+    import orjson as _json
+except ImportError:  # pragma: no cover - optional dependency
+    import json as _json
 
-@dataclass
+
+@dataclass(slots=True)
 class Chunk:
     primitive_guid: UUID
     offset: int
@@ -16,27 +21,32 @@ class Chunk:
     vertex_count: int
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamLayout:
     role: str
     stride: int
-    chunks: Sequence[Chunk]
+    chunks: Tuple[Chunk, ...]
+    _by_guid: Dict[UUID, List[Chunk]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.chunks = tuple(self.chunks)
+        self._by_guid = {}
+        for chunk in self.chunks:
+            self._by_guid.setdefault(chunk.primitive_guid, []).append(chunk)
 
     def chunk_for(self, primitive_guid: UUID) -> Optional[Chunk]:
         """Return the first chunk that matches ``primitive_guid``."""
 
-        for chunk in self.chunks:
-            if chunk.primitive_guid == primitive_guid:
-                return chunk
-        return None
+        matches = self._by_guid.get(primitive_guid)
+        return matches[0] if matches else None
 
     def chunks_for(self, primitive_guid: UUID) -> Sequence[Chunk]:
         """Return all chunks referenced by ``primitive_guid``."""
 
-        return [chunk for chunk in self.chunks if chunk.primitive_guid == primitive_guid]
+        return list(self._by_guid.get(primitive_guid, ()))
 
 
-@dataclass
+@dataclass(slots=True)
 class VertexSetLayout:
     vertex_count: int
     streams: Mapping[str, StreamLayout]
@@ -46,45 +56,60 @@ class ChunkTableStore:
     """Caches chunk table JSON breakdowns per mesh."""
 
     def __init__(self) -> None:
-        self._cache: MutableMapping[Path, Mapping[UUID, VertexSetLayout]] = {}
+        # Keyed by the resolved sidecar path; the stored mtime invalidates the
+        # entry when the breakdown is regenerated between Blender passes.
+        self._cache: MutableMapping[str, Tuple[int, Mapping[UUID, VertexSetLayout]]] = {}
 
-    def load(self, core_path: Path) -> Mapping[UUID, VertexSetLayout]:
-        if core_path in self._cache:
-            return self._cache[core_path]
+    def clear(self) -> None:
+        """Drop every cached breakdown."""
+
+        self._cache.clear()
 
+    def load(self, core_path: Path) -> Mapping[UUID, VertexSetLayout]:
         candidate = core_path.with_suffix(".chunk_tables.json")
         if not candidate.exists():
             raise FileNotFoundError(candidate)
 
-        payload = json.loads(candidate.read_text())
-        vertex_sets: Dict[UUID, VertexSetLayout] = {}
-
-        for guid_hex, entry in payload.get("vertexSets", {}).items():
-            streams: Dict[str, StreamLayout] = {}
-            for role, stream_data in entry.get("streams", {}).items():
-                chunks = [
-                    Chunk(
-                        primitive_guid=UUID(chunk["primitiveGuid"]),
-                        offset=int(chunk["offset"]),
-                        length=int(chunk["length"]),
-                        vertex_count=int(
-                            chunk.get("vertexCount", entry.get("vertexCount", 0))
-                        ),
-                    )
-                    for chunk in stream_data.get("chunks", [])
-                ]
-                streams[role] = StreamLayout(
-                    role=role,
-                    stride=int(stream_data.get("stride", 0)),
-                    chunks=chunks,
+        key = os.fspath(candidate.resolve())
+        mtime = candidate.stat().st_mtime_ns
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        vertex_sets = _parse_breakdown(candidate)
+        self._cache[key] = (mtime, vertex_sets)
+        return vertex_sets
+
+
+def _parse_breakdown(candidate: Path) -> Dict[UUID, VertexSetLayout]:
+    payload = _json.loads(candidate.read_bytes())
+    vertex_sets: Dict[UUID, VertexSetLayout] = {}
+
+    for guid_hex, entry in payload.get("vertexSets", {}).items():
+        streams: Dict[str, StreamLayout] = {}
+        for role, stream_data in entry.get("streams", {}).items():
+            chunks = tuple(
+                Chunk(
+                    primitive_guid=UUID(chunk["primitiveGuid"]),
+                    offset=int(chunk["offset"]),
+                    length=int(chunk["length"]),
+                    vertex_count=int(
+                        chunk.get("vertexCount", entry.get("vertexCount", 0))
+                    ),
                 )
-            vertex_sets[UUID(guid_hex)] = VertexSetLayout(
-                vertex_count=int(entry.get("vertexCount", 0)),
-                streams=streams,
+                for chunk in stream_data.get("chunks", [])
+            )
+            streams[role] = StreamLayout(
+                role=role,
+                stride=int(stream_data.get("stride", 0)),
+                chunks=chunks,
             )
+        vertex_sets[UUID(guid_hex)] = VertexSetLayout(
+            vertex_count=int(entry.get("vertexCount", 0)),
+            streams=streams,
+        )
 
-        self._cache[core_path] = vertex_sets
-        return vertex_sets
+    return vertex_sets
 
 
 _STORE = ChunkTableStore()
@@ -15,7 +15,8 @@ Horizon codepath touches ``vertexStream`` on a Death Stranding primitive.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import List
 
 
@@ -23,7 +24,7 @@ class DeathStrandingExportError(RuntimeError):
     """Raised when exporting a Death Stranding mesh is not yet supported."""
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class PrimitiveBinding:
     """Links a mesh resource primitive to its object name in Blender.
 
@@ -35,10 +36,10 @@ class PrimitiveBinding:
 
     primitive_index: int
     mesh_name: str
+    object_name: str = field(init=False, repr=False, compare=False)
 
-    @property
-    def object_name(self) -> str:
-        return f"{self.primitive_index}_{self.mesh_name}"
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "object_name", f"{self.primitive_index}_{self.mesh_name}")
 
 
 def collect_primitives_sharing_vertex_set(
@@ -61,13 +62,17 @@ def collect_primitives_sharing_vertex_set(
         Used to reproduce Blender's export object naming pattern.
     """
 
+    # Every binding of a mesh shares the same name; intern it once.
+    mesh_name = sys.intern(mesh_name)
     bindings: List[PrimitiveBinding] = []
     primitives = getattr(mesh_resource, "primitives", [])
     for index, primitive in enumerate(primitives):
-        reference = getattr(primitive, "vertexRef", None)
-        if reference is None:
+        try:
+            guid = primitive.vertexRef.guid
+        except AttributeError:
+            # Missing or null (type 0) references carry no GUID to share.
             continue
-        if getattr(reference, "guid", None) == vertex_guid:
+        if guid == vertex_guid:
             bindings.append(PrimitiveBinding(index, mesh_name))
     return bindings
 
@@ -88,7 +93,10 @@ def export_death_stranding_mesh(
     stream layout.
     """
 
-    vertex_guid = getattr(getattr(primitive, "vertexRef", None), "guid", None)
+    try:
+        vertex_guid = primitive.vertexRef.guid
+    except AttributeError:
+        vertex_guid = None
     if vertex_guid is None:
         raise DeathStrandingExportError(
             "Primitive does not expose a vertex stream reference; cannot export"
@@ -1,16 +1,49 @@
 """Death Stranding-specific stream parsing helpers."""
 from __future__ import annotations
 
-import json
+import functools
+import os
+import struct
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from typing import Dict, List, Mapping, MutableMapping, Optional, Tuple
 from uuid import UUID
 
+try:  # prefer orjson when Blender's Python has it available
+    import orjson as _json
+except ImportError:  # pragma: no cover - optional dependency
+    import json as _json
+
 from .typing import ByteReaderProtocol
 
+_SET_HEADER = struct.Struct("<4I")
+
+
+@functools.lru_cache(maxsize=16)
+def _descriptor_layout(
+    stream_count: int,
+) -> Tuple[struct.Struct, Tuple[Tuple[int, int, int, int], ...]]:
+    """Return the descriptor ``Struct`` and word spans for ``stream_count``.
+
+    The first descriptor carries six header words and a two-word tail, the
+    others four header words; each header is followed by a four-word GUID.
+    Each span is ``(header_start, guid_start, tail_start, tail_end)`` in words.
+    Stream counts cluster around 2-4, so the few layouts are built once.
+    """
+
+    spans: List[Tuple[int, int, int, int]] = []
+    position = 0
+    for index in range(stream_count):
+        header_start = position
+        guid_start = header_start + (6 if index == 0 else 4)
+        tail_start = guid_start + 4
+        tail_end = tail_start + (2 if index == 0 else 0)
+        spans.append((header_start, guid_start, tail_start, tail_end))
+        position = tail_end
+    return struct.Struct(f"<{position}I"), tuple(spans)
+
 
-@dataclass
+@dataclass(slots=True)
 class StreamDescriptor:
     """Metadata extracted from a single Death Stranding vertex stream."""
 
@@ -19,7 +52,7 @@ class StreamDescriptor:
     tail: Tuple[int, ...]
 
 
-@dataclass
+@dataclass(slots=True)
 class VertexStreamSet:
     """Structured representation of a ``VertexStreamSet`` block."""
 
@@ -29,10 +62,6 @@ class VertexStreamSet:
     streams: List[StreamDescriptor]
     trailing: bytes
 
-    @classmethod
-    def _read_guid(cls, words: Sequence[int]) -> UUID:
-        return UUID(bytes_le=b"".join(word.to_bytes(4, "little") for word in words))
-
     @classmethod
     def parse(cls, reader: ByteReaderProtocol, f, *, block_end: int) -> "VertexStreamSet":
         """Parse a Death Stranding ``VertexStreamSet``.
@@ -40,7 +69,9 @@ class VertexStreamSet:
         Parameters
         ----------
         reader:
-            Adapter providing ``uint32`` for little-endian parsing.
+            Adapter providing ``uint32`` for little-endian parsing.  Kept for
+            compatibility with the Horizon block parsers; the payload is now
+            decoded in bulk with :mod:`struct` instead.
         f:
             Binary file object currently positioned at the start of the block
             payload (just after the GUID written by :class:`DataBlock`).
@@ -49,26 +80,44 @@ class VertexStreamSet:
             capture any trailing padding bytes without depending on the caller.
         """
 
-        vertex_count = reader.uint32(f)
-        stream_count = reader.uint32(f)
-        field2 = reader.uint32(f)
-        field3 = reader.uint32(f)
+        payload = f.read(max(block_end - f.tell(), 0))
+        return cls.from_buffer(payload)
+
+    @classmethod
+    def from_buffer(cls, data) -> "VertexStreamSet":
+        """Decode a ``VertexStreamSet`` payload already held in memory.
+
+        ``data`` is any buffer (``bytes``, ``memoryview``, ``mmap``) starting at
+        the block payload; bytes past the last descriptor become ``trailing``.
+        This is shared with ``tools/analyze_ds_core.py`` so the CLI and the
+        add-on decode the block identically.
+        """
+
+        vertex_count, stream_count, field2, field3 = _SET_HEADER.unpack_from(data, 0)
+
+        # 12 words for the first descriptor, 8 for each of the others.
+        needed = (12 + 8 * (stream_count - 1)) * 4 if stream_count else 0
+        if needed > len(data) - _SET_HEADER.size:
+            raise ValueError(
+                f"VertexStreamSet claims {stream_count} streams ({needed} descriptor "
+                f"bytes) but only {len(data) - _SET_HEADER.size} bytes follow the header"
+            )
+
+        body, spans = _descriptor_layout(stream_count)
+        words = body.unpack_from(data, _SET_HEADER.size)
 
         streams: List[StreamDescriptor] = []
-        for index in range(stream_count):
-            header_length = 6 if index == 0 else 4
-            header = tuple(reader.uint32(f) for _ in range(header_length))
-            guid_words = tuple(reader.uint32(f) for _ in range(4))
-            chunk_guid = cls._read_guid(guid_words)
-            tail: Tuple[int, ...]
-            if index == 0:
-                tail = (reader.uint32(f), reader.uint32(f))
-            else:
-                tail = ()
-            streams.append(StreamDescriptor(header=header, chunk_guid=chunk_guid, tail=tail))
-
-        remaining = max(block_end - f.tell(), 0)
-        trailing = f.read(remaining) if remaining else b""
+        for header_start, guid_start, tail_start, tail_end in spans:
+            guid_offset = _SET_HEADER.size + guid_start * 4
+            streams.append(
+                StreamDescriptor(
+                    header=words[header_start:guid_start],
+                    chunk_guid=UUID(bytes_le=bytes(data[guid_offset : guid_offset + 16])),
+                    tail=words[tail_start:tail_end],
+                )
+            )
+
+        trailing = bytes(data[_SET_HEADER.size + body.size :])
 
         return cls(
             vertex_count=vertex_count,
@@ -78,27 +127,52 @@ class VertexStreamSet:
             trailing=trailing,
         )
 
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "vertex_count": self.vertex_count,
+            "stream_count": self.stream_count,
+            "header_tail": self.header_tail,
+            "streams": [
+                {
+                    "header": stream.header,
+                    "chunk_guid": str(stream.chunk_guid),
+                    "tail": stream.tail,
+                }
+                for stream in self.streams
+            ],
+            "trailing": self.trailing.hex(),
+        }
+
 
-_STREAM_MAP_CACHE: MutableMapping[Path, Mapping[str, object]] = {}
+_STREAM_MAP_CACHE: MutableMapping[str, Tuple[int, Mapping[str, object]]] = {}
 
 
 def load_stream_mapping(core_path: Path) -> Optional[Mapping[str, object]]:
     """Return the Decima Workshop-derived stream map for ``core_path``.
 
     The helper looks for a sibling JSON file with the ``.streams.json`` suffix
-    created by :mod:`tools.dump_ds_stream_map`.  The payload is cached so that
-    multiple primitives can reuse the decoded mapping without re-reading the
-    file.
+    created by :mod:`tools.dump_ds_stream_map`.  The payload is cached per
+    resolved path and modification time so that multiple primitives can reuse
+    the decoded mapping without re-reading the file, while a regenerated map
+    is picked up on the next call.
     """
 
     mapping_path = core_path.with_suffix(core_path.suffix + ".streams.json")
     if not mapping_path.exists():
         return None
 
-    cached = _STREAM_MAP_CACHE.get(mapping_path)
-    if cached is not None:
-        return cached
+    key = os.fspath(mapping_path.resolve())
+    mtime = mapping_path.stat().st_mtime_ns
+    cached = _STREAM_MAP_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
 
-    payload: Mapping[str, object] = json.loads(mapping_path.read_text())
-    _STREAM_MAP_CACHE[mapping_path] = payload
+    payload: Mapping[str, object] = _json.loads(mapping_path.read_bytes())
+    _STREAM_MAP_CACHE[key] = (mtime, payload)
     return payload
+
+
+def clear_stream_mapping_cache() -> None:
+    """Forget every stream map loaded by :func:`load_stream_mapping`."""
+
+    _STREAM_MAP_CACHE.clear()
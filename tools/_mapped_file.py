@@ -0,0 +1,40 @@
+"""Read-only memory mapping shared by the ``.core`` analysis tools."""
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+
+@contextlib.contextmanager
+def map_file(path: Path) -> Iterator[memoryview]:
+    """Yield a read-only view of ``path`` that is paged in rather than copied.
+
+    ``mmap`` rejects zero-length files, so an empty file yields an empty view.
+    Slices of the view must not outlive the ``with`` block; if one is still
+    alive (for example pinned by a traceback) the mapping cannot be closed,
+    and a warning is printed instead of failing the caller.
+    """
+
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:
+            print(
+                f"[warn] could not close the mapping of {path}: a payload slice is "
+                "still referenced; it is released once that slice is dropped",
+                file=sys.stderr,
+            )
@@ -9,10 +9,27 @@ from __future__ import annotations
 
 import argparse
 import dataclasses
+import json
+import mmap
 import struct
+import sys
 import uuid
 from pathlib import Path
-from typing import Dict, Iterator, List, Sequence, Tuple
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Allow running the script directly from a checkout without installing the
+# add-on: ``decima`` lives next to this ``tools`` directory.  ``tools`` itself
+# is added too, so its private helpers resolve when imported as a package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _mapped_file import map_file  # noqa: E402
+from decima.ds_vertex_streams import VertexStreamSet  # noqa: E402
 
 # Known block identifiers gathered from analysing mesh_test.core.  The Horizon
 # Zero Dawn tool uses a different numeric set, therefore the first step towards
@@ -32,35 +49,35 @@ BLOCK_NAMES: Dict[int, str] = {
     0x5FE633B37CEDBF84: "IndexStream",
 }
 
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
 
-def _read(fmt: str, data: memoryview, offset: int) -> Tuple[Tuple[int, ...], int]:
-    size = struct.calcsize(fmt)
-    values = struct.unpack_from(fmt, data, offset)
-    return values, offset + size
+_BLOCK_HDR = struct.Struct("<Qi")
+_QUAD_U32 = struct.Struct("<IIII")
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Block:
     offset: int
     block_id: int
     size: int
     guid: uuid.UUID
-    payload: bytes
+    payload: memoryview
 
     @property
     def name(self) -> str:
         return BLOCK_NAMES.get(self.block_id, f"0x{self.block_id:016X}")
 
 
-def iter_blocks(blob: bytes) -> Iterator[Block]:
+def iter_blocks(blob: Buffer) -> Iterator[Block]:
     offset = 0
     view = memoryview(blob)
     while offset + 28 <= len(blob):
-        (block_id,), offset = _read("<Q", view, offset)
-        (size,), offset = _read("<i", view, offset)
+        block_id, size = _BLOCK_HDR.unpack_from(view, offset)
+        offset += _BLOCK_HDR.size
         guid_bytes = bytes(view[offset : offset + 16])
         offset += 16
-        payload = bytes(view[offset : offset + size - 16])
+        payload = view[offset : offset + size - 16]
         offset += size - 16
         yield Block(
             offset=offset - size,
@@ -71,79 +88,7 @@ def iter_blocks(blob: bytes) -> Iterator[Block]:
         )
 
 
-@dataclasses.dataclass
-class StreamDescriptor:
-    raw_fields: List[int]
-    guid: uuid.UUID
-    trailing: bytes
-
-    def describe(self) -> Dict[str, object]:
-        base: Dict[str, object] = {
-            "raw_fields": self.raw_fields,
-            "guid": str(self.guid),
-        }
-        if self.trailing:
-            base["trailing_bytes"] = self.trailing.hex()
-        return base
-
-
-@dataclasses.dataclass
-class VertexStreamSet:
-    vertex_count: int
-    stream_count: int
-    header_tail: Tuple[int, int]
-    streams: List[StreamDescriptor]
-    raw_values: List[int]
-
-    @classmethod
-    def parse(cls, block: Block) -> "VertexStreamSet":
-        payload = block.payload
-        head = memoryview(payload)
-        offset = 0
-        (vertex_count, stream_count, field2, field3), offset = _read(
-            "<IIII", head, offset
-        )
-        remaining = payload[offset:]
-        ints = list(
-            struct.unpack(
-                "<" + "I" * (len(remaining) // 4), remaining[: len(remaining) // 4 * 4]
-            )
-        )
-        tail = remaining[len(ints) * 4 :]
-        guid_words = ints[-stream_count * 4 :] if stream_count else []
-        raw_values = ints[: -stream_count * 4] if stream_count else ints
-        streams: List[StreamDescriptor] = []
-        for i in range(stream_count):
-            words = guid_words[i * 4 : (i + 1) * 4]
-            guid_bytes = b"".join(struct.pack("<I", value) for value in words)
-            streams.append(StreamDescriptor(raw_fields=[], guid=uuid.UUID(bytes_le=guid_bytes), trailing=b""))
-        if streams:
-            streams[-1].trailing = tail
-        vertex_set = cls(
-            vertex_count=vertex_count,
-            stream_count=stream_count,
-            header_tail=(field2, field3),
-            streams=streams,
-            raw_values=raw_values,
-        )
-        # Attach the raw integers to the first stream descriptor for debugging
-        # purposes so downstream tooling can inspect the per-stream metadata
-        # without guessing at the layout yet.
-        if vertex_set.streams:
-            vertex_set.streams[0].raw_fields = raw_values
-        return vertex_set
-
-    def to_dict(self) -> Dict[str, object]:
-        return {
-            "vertex_count": self.vertex_count,
-            "stream_count": self.stream_count,
-            "header_tail": self.header_tail,
-            "raw_values": self.raw_values,
-            "streams": [stream.describe() for stream in self.streams],
-        }
-
-
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class IndexStream:
     index_count: int
     unknown: Tuple[int, int, int]
@@ -151,9 +96,9 @@ class IndexStream:
 
     @classmethod
     def parse(cls, block: Block) -> "IndexStream":
-        data = memoryview(block.payload)
-        offset = 0
-        (index_count, field1, field2, field3), offset = _read("<IIII", data, offset)
+        data = block.payload
+        index_count, field1, field2, field3 = _QUAD_U32.unpack_from(data, 0)
+        offset = _QUAD_U32.size
         guid_bytes = bytes(data[offset : offset + 16])
         guid = uuid.UUID(bytes_le=guid_bytes)
         return cls(index_count=index_count, unknown=(field1, field2, field3), guid=guid)
@@ -166,7 +111,7 @@ class IndexStream:
         }
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class PrimitiveSummary:
     guid: uuid.UUID
     vertex_ref: uuid.UUID
@@ -174,7 +119,7 @@ class PrimitiveSummary:
 
     @classmethod
     def parse(cls, block: Block) -> "PrimitiveSummary":
-        data = memoryview(block.payload)
+        data = block.payload
         offset = 4  # skip flags
         vertex_type = data[offset]
         offset += 1
@@ -194,15 +139,21 @@ class PrimitiveSummary:
 
 
 def summarise(path: Path) -> Dict[str, object]:
-    blob = path.read_bytes()
-    blocks = list(iter_blocks(blob))
+    # Map the file rather than reading it so large .core files are paged in on
+    # demand.  The summary only holds decoded values, so every payload slice
+    # is gone by the time the mapping is closed.
+    with map_file(path) as view:
+        return _summarise_blocks(list(iter_blocks(view)))
+
+
+def _summarise_blocks(blocks: List[Block]) -> Dict[str, object]:
     summary: Dict[str, object] = {
         "block_count": len(blocks),
         "blocks": [],
     }
     primitives: List[Dict[str, str]] = []
-    vertex_sets: Dict[uuid.UUID, Dict[str, object]] = {}
-    index_sets: Dict[uuid.UUID, Dict[str, object]] = {}
+    vertex_sets: Dict[str, Dict[str, object]] = {}
+    index_sets: Dict[str, Dict[str, object]] = {}
     for block in blocks:
         entry = {
             "offset": block.offset,
@@ -216,12 +167,16 @@ def summarise(path: Path) -> Dict[str, object]:
             entry["details"] = primitive.to_dict()
             primitives.append(primitive.to_dict())
         elif block.block_id == 0x3AC29A123FAABAB4:
-            vertex = VertexStreamSet.parse(block)
-            vertex_sets[block.guid] = vertex.to_dict()
-            entry["details"] = vertex.to_dict()
+            try:
+                details = VertexStreamSet.from_buffer(block.payload).to_dict()
+            except (struct.error, ValueError) as exc:
+                # A truncated or corrupt block should not abort the summary.
+                details = {"error": str(exc)}
+            vertex_sets[str(block.guid)] = details
+            entry["details"] = details
         elif block.block_id == 0x5FE633B37CEDBF84:
             index = IndexStream.parse(block)
-            index_sets[block.guid] = index.to_dict()
+            index_sets[str(block.guid)] = index.to_dict()
             entry["details"] = index.to_dict()
         summary["blocks"].append(entry)
     summary["primitives"] = primitives
@@ -230,6 +185,14 @@ def summarise(path: Path) -> Dict[str, object]:
     return summary
 
 
+def dump_json(data: Dict[str, object]) -> bytes:
+    """Serialise a :func:`summarise` result, preferring ``orjson``."""
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("core", type=Path, help="Death Stranding .core file")
@@ -239,8 +202,11 @@ def main() -> None:
         default=0,
         help="Limit the number of blocks displayed in the textual summary",
     )
+    parser.add_argument("--json", type=Path, help="Also write the full summary to this JSON path")
     args = parser.parse_args()
     data = summarise(args.core)
+    if args.json:
+        args.json.write_bytes(dump_json(data))
     blocks: Sequence[Dict[str, object]] = data["blocks"]
     limit = args.limit or len(blocks)
     for block in blocks[:limit]:
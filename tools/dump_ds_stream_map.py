@@ -18,149 +18,289 @@ from __future__ import annotations
 
 import argparse
 import json
+import mmap
 import struct
-import uuid
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Mapping, MutableMapping
+from typing import Dict, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Private helpers live next to this script; put ``tools`` on ``sys.path`` so
+# they resolve the same way when the module is imported as a package.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _mapped_file import map_file  # noqa: E402
 
 
 VERTEX_STREAM_SET_ID = 0x3AC29A123FAABAB4
 PRIMITIVE_RESOURCE_ID = 0xEE49D93DA4C1F4B8
 
+# Block id, block size (which includes the GUID) and the block GUID.
+_HDR = struct.Struct("<Qi16s")
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Block:
     block_id: int
-    guid: uuid.UUID
-    payload: bytes
+    guid: bytes  # raw little-endian GUID; only matching blocks need a UUID
+    payload: memoryview
 
 
-def iter_blocks(blob: bytes) -> Iterator[Block]:
+def iter_blocks(blob: Buffer) -> Iterator[Block]:
     """Yield ``Block`` entries from a Decima ``.core`` blob."""
 
     offset = 0
     view = memoryview(blob)
-    while offset + 28 <= len(blob):
-        (block_id,) = struct.unpack_from("<Q", view, offset)
-        offset += 8
-        (size,) = struct.unpack_from("<i", view, offset)
-        offset += 4
-        guid = uuid.UUID(bytes_le=bytes(view[offset : offset + 16]))
-        offset += 16
-        payload = bytes(view[offset : offset + size - 16])
+    while offset + _HDR.size <= len(blob):
+        block_id, size, guid = _HDR.unpack_from(view, offset)
+        if size < 16:
+            break  # corrupt header: the size must at least cover the GUID
+        offset += _HDR.size
+        payload = view[offset : offset + size - 16]
         offset += size - 16
         yield Block(block_id=block_id, guid=guid, payload=payload)
 
 
-@dataclass
+_WANTED_BLOCK_IDS = frozenset((VERTEX_STREAM_SET_ID, PRIMITIVE_RESOURCE_ID))
+
+
+def _load_numba_scanner():
+    """Return :func:`_scan_nb.scan_headers`, or ``None`` without NumPy/Numba.
+
+    Imported lazily: loading Numba and the compiled scanner costs far more
+    than walking a typical mesh ``.core`` in Python, so it is opt-in.
+    """
+
+    # Always imported as top-level ``_scan_nb`` (``tools`` is on ``sys.path``),
+    # also when this file is loaded as ``tools.dump_ds_stream_map``: Numba's
+    # on-disk cache records the module name, so two names for one file break
+    # the cached build.
+    try:
+        from _scan_nb import scan_headers
+    except ImportError:
+        return None
+    return scan_headers
+
+
+def _scan_core(
+    view: memoryview, scan_headers=None
+) -> Iterator[Tuple[int, bytes, memoryview, int]]:
+    """Yield ``(block_id, guid, payload, end)`` for the blocks :func:`load_core` uses.
+
+    ``end`` is the offset just past the block, so a caller stopping early can
+    tell whether anything was left unscanned.
+
+    Unlike :func:`iter_blocks` nothing is allocated for the (far more common)
+    blocks that are skipped.  When a compiled ``scan_headers`` is supplied the
+    header walk runs there and Python only visits the matching blocks.
+    """
+
+    if scan_headers is not None:
+        yield from _scan_core_nb(view, scan_headers)
+        return
+
+    offset = 0
+    end = len(view)
+    while offset + _HDR.size <= end:
+        block_id, size, guid = _HDR.unpack_from(view, offset)
+        if size < 16:
+            break  # same corrupt-header rule as iter_blocks and _scan_nb
+        offset += _HDR.size
+        if block_id in _WANTED_BLOCK_IDS:
+            yield block_id, guid, view[offset : offset + size - 16], offset + size - 16
+        offset += size - 16
+
+
+def _scan_core_nb(view: memoryview, scan_headers) -> Iterator[Tuple[int, bytes, memoryview, int]]:
+    import numpy as np
+
+    ids, offsets, sizes = scan_headers(np.frombuffer(view, dtype=np.uint8))
+
+    wanted = np.array(sorted(_WANTED_BLOCK_IDS), dtype=np.uint64)
+    for index in np.flatnonzero(np.isin(ids, wanted)):
+        offset = int(offsets[index])
+        payload_start = offset + _HDR.size
+        end = offset + 12 + int(sizes[index])
+        yield (
+            int(ids[index]),
+            bytes(view[offset + 12 : payload_start]),
+            view[payload_start:end],
+            end,
+        )
+
+
+# GUIDs are kept as their raw 16 little-endian bytes: they are only used as
+# dictionary keys and are stringified once when the mapping is written.
+@dataclass(slots=True, frozen=True)
 class VertexStreamSet:
-    guid: uuid.UUID
+    guid: bytes
     vertex_count: int
 
 
 def parse_vertex_stream_set(block: Block) -> VertexStreamSet:
-    (vertex_count,) = struct.unpack_from("<I", block.payload, 0)
+    vertex_count = int.from_bytes(block.payload[0:4], "little")
     return VertexStreamSet(guid=block.guid, vertex_count=vertex_count)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PrimitiveReference:
-    guid: uuid.UUID
-    vertex_ref: uuid.UUID
-    index_ref: uuid.UUID
+    guid: bytes
+    vertex_ref: bytes
+    index_ref: bytes
 
 
 def parse_primitive_reference(block: Block) -> PrimitiveReference:
-    data = memoryview(block.payload)
+    data = block.payload
     offset = 4  # skip flags
     vertex_type = data[offset]
     offset += 1
-    vertex_guid = uuid.UUID(bytes_le=bytes(data[offset : offset + 16]))
+    vertex_guid = bytes(data[offset : offset + 16])
     offset += 16
     index_type = data[offset]
     offset += 1
-    index_guid = uuid.UUID(bytes_le=bytes(data[offset : offset + 16]))
+    index_guid = bytes(data[offset : offset + 16])
     _ = vertex_type, index_type  # type markers retained for potential validation
     return PrimitiveReference(guid=block.guid, vertex_ref=vertex_guid, index_ref=index_guid)
 
 
-def load_vertex_sets(core_blob: bytes) -> Dict[uuid.UUID, VertexStreamSet]:
-    sets: Dict[uuid.UUID, VertexStreamSet] = {}
-    for block in iter_blocks(core_blob):
-        if block.block_id == VERTEX_STREAM_SET_ID:
-            sets[block.guid] = parse_vertex_stream_set(block)
-    return sets
+def load_core(
+    core_blob: Buffer,
+    expected_primitives: Optional[int] = None,
+    *,
+    use_numba: bool = False,
+) -> Tuple[Dict[bytes, VertexStreamSet], List[PrimitiveReference], bool]:
+    """Collect vertex stream sets and primitive references in a single scan.
 
+    When ``expected_primitives`` is given (typically the primitive count of
+    the companion ``.dmf``), the scan stops as soon as that many primitive
+    references and every vertex stream set they point at have been seen.
+    This is a heuristic relying on mesh ``.core`` files keeping these blocks
+    ahead of the unrelated tail data; without the hint the whole blob is
+    scanned.  The returned flag is true when the scan stopped with blocks
+    still unread, i.e. the ``.core`` may hold more primitives than were
+    counted.
 
-def load_primitives(core_blob: bytes) -> List[PrimitiveReference]:
+    ``use_numba`` walks the headers with the compiled scanner in
+    :mod:`_scan_nb`.  It only pays off on very large blobs and silently falls
+    back to the pure-Python walk when NumPy/Numba are unavailable.
+    """
+
+    scan_headers = _load_numba_scanner() if use_numba else None
+
+    sets: Dict[bytes, VertexStreamSet] = {}
     refs: List[PrimitiveReference] = []
-    for block in iter_blocks(core_blob):
-        if block.block_id == PRIMITIVE_RESOURCE_ID:
-            refs.append(parse_primitive_reference(block))
-    return refs
+    missing: Set[bytes] = set()  # vertex_refs not yet matched by a stream set
+    view = memoryview(core_blob)
+    for block_id, guid, payload, end in _scan_core(view, scan_headers):
+        block = Block(block_id=block_id, guid=guid, payload=payload)
+        if block_id == VERTEX_STREAM_SET_ID:
+            vertex_set = parse_vertex_stream_set(block)
+            sets[vertex_set.guid] = vertex_set
+            missing.discard(vertex_set.guid)
+        else:
+            ref = parse_primitive_reference(block)
+            refs.append(ref)
+            if ref.vertex_ref not in sets:
+                missing.add(ref.vertex_ref)
+        if (
+            expected_primitives is not None
+            and len(refs) >= expected_primitives
+            and not missing
+        ):
+            return sets, refs, end + _HDR.size <= len(view)
+    return sets, refs, False
+
+
+def load_vertex_sets(core_blob: Buffer) -> Dict[bytes, VertexStreamSet]:
+    return load_core(core_blob)[0]
 
 
-def group_attributes_by_view(attributes: Mapping[str, Mapping[str, object]]) -> Dict[int, List[Mapping[str, object]]]:
-    grouped: Dict[int, List[Mapping[str, object]]] = {}
-    for semantic, payload in attributes.items():
-        if "bufferViewId" not in payload:
-            continue
-        view_id = int(payload["bufferViewId"])
-        enriched = dict(payload)
-        enriched["semantic"] = semantic
-        grouped.setdefault(view_id, []).append(enriched)
-    return grouped
+def load_primitives(core_blob: Buffer) -> List[PrimitiveReference]:
+    return load_core(core_blob)[1]
+
+
+def _guid_str(raw: bytes) -> str:
+    """Format a little-endian GUID like ``str(uuid.UUID(bytes_le=raw))``.
+
+    The first three fields are byte-swapped to match ``bytes_le`` before the
+    hex string is split, avoiding a ``UUID`` object per primitive.
+    """
+
+    h = (raw[3::-1] + raw[5:3:-1] + raw[7:5:-1] + raw[8:]).hex()
+    return f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
 
 
 def build_mapping(
-    vertex_sets: Mapping[uuid.UUID, VertexStreamSet],
-    primitives: Iterable[PrimitiveReference],
+    vertex_sets: Mapping[bytes, VertexStreamSet],
+    primitives: Sequence[PrimitiveReference],
     dmf: Mapping[str, object],
 ) -> Dict[str, object]:
     """Match ``VertexStreamSet`` GUIDs with ``.dmf`` buffer views."""
 
-    instance_primitives = list(dmf.get("instances", [{}])[0].get("mesh", {}).get("primitives", []))
-    buffer_views: List[Mapping[str, int]] = dmf.get("bufferViews", [])
+    try:
+        instance_primitives = dmf["instances"][0]["mesh"]["primitives"]
+    except (KeyError, IndexError) as exc:
+        raise RuntimeError("The .dmf export does not describe any mesh primitives") from exc
 
-    primitive_list = list(primitives)
-    limit = min(len(primitive_list), len(instance_primitives))
+    limit = min(len(primitives), len(instance_primitives))
     if limit == 0:
         raise RuntimeError("No primitives found in either the .core or .dmf assets")
-    if len(primitive_list) != len(instance_primitives):
+    if len(primitives) != len(instance_primitives):
         print(
             "[warn] primitive count mismatch between .core and .dmf exports; "
             f"truncating to {limit} entries"
         )
+    # (offset, size) per buffer view, so the per-attribute loop avoids dict lookups.
+    buffer_views: List[Tuple[int, int]] = [
+        (int(view.get("offset", 0)), int(view.get("size", 0)))
+        for view in dmf.get("bufferViews", [])
+    ]
     result: MutableMapping[str, object] = {}
 
-    for prim_ref, dmf_prim in zip(primitive_list[:limit], instance_primitives[:limit]):
+    # zip stops at the shorter sequence, which is exactly ``limit`` entries.
+    for prim_ref, dmf_prim in zip(primitives, instance_primitives):
         vertex_set = vertex_sets.get(prim_ref.vertex_ref)
+        vertex_guid = _guid_str(prim_ref.vertex_ref)
         if vertex_set is None:
-            raise KeyError(f"Vertex stream set {prim_ref.vertex_ref} not found in .core")
+            raise KeyError(f"Vertex stream set {vertex_guid} not found in .core")
 
-        grouped = group_attributes_by_view(dmf_prim.get("vertexAttributes", {}))
         streams: List[Mapping[str, object]] = []
-
-        for view_id, attributes in grouped.items():
-            try:
-                buffer_view = buffer_views[view_id]
-            except IndexError as exc:  # pragma: no cover - defensive guard
-                raise IndexError(f"bufferViewId {view_id} missing from .dmf bufferViews") from exc
-
-            stream_entry = {
-                "bufferViewId": view_id,
-                "offset": buffer_view.get("offset", 0),
-                "length": buffer_view.get("size", 0),
-                "attributes": attributes,
-            }
-            if attributes:
-                stream_entry["stride"] = attributes[0].get("stride")
-            streams.append(stream_entry)
-
-        result[str(prim_ref.vertex_ref)] = {
+        streams_by_view: Dict[int, Dict[str, object]] = {}
+
+        for semantic, payload in dmf_prim.get("vertexAttributes", {}).items():
+            if "bufferViewId" not in payload:
+                continue
+            view_id = int(payload["bufferViewId"])
+            enriched = {**payload, "semantic": semantic}
+
+            stream_entry = streams_by_view.get(view_id)
+            if stream_entry is None:
+                try:
+                    offset, length = buffer_views[view_id]
+                except IndexError as exc:  # pragma: no cover - defensive guard
+                    raise IndexError(f"bufferViewId {view_id} missing from .dmf bufferViews") from exc
+
+                stream_entry = {
+                    "bufferViewId": view_id,
+                    "offset": offset,
+                    "length": length,
+                    "attributes": [],
+                    "stride": enriched.get("stride"),
+                }
+                streams_by_view[view_id] = stream_entry
+                streams.append(stream_entry)
+            stream_entry["attributes"].append(enriched)
+
+        result[vertex_guid] = {
             "vertexCount": vertex_set.vertex_count,
-            "primitiveGuid": str(prim_ref.guid),
+            "primitiveGuid": _guid_str(prim_ref.guid),
             "streams": streams,
             "index": {
                 "count": dmf_prim.get("indexCount"),
@@ -177,16 +317,45 @@ def main() -> None:
     parser.add_argument("core", type=Path, help="Death Stranding .core file")
     parser.add_argument("dmf", type=Path, help="Companion Decima Workshop .dmf export")
     parser.add_argument("--output", type=Path, help="Destination JSON path (defaults to <core>.streams.json)")
+    parser.add_argument(
+        "--numba",
+        action="store_true",
+        help="Walk block headers with the Numba-compiled scanner (only worth it for very large .core files)",
+    )
     args = parser.parse_args()
 
-    core_blob = args.core.read_bytes()
-    vertex_sets = load_vertex_sets(core_blob)
-    primitive_refs = load_primitives(core_blob)
-    dmf_payload = json.loads(args.dmf.read_text())
+    if orjson is not None:
+        dmf_payload = orjson.loads(args.dmf.read_bytes())
+    else:
+        dmf_payload = json.loads(args.dmf.read_text())
+    try:
+        expected_primitives: Optional[int] = len(dmf_payload["instances"][0]["mesh"]["primitives"])
+    except (KeyError, IndexError, TypeError):
+        expected_primitives = None
+
+    # Walk a read-only mapping so the .core is paged in rather than copied.
+    # The parsed records only hold copied GUID bytes and ints, so no payload
+    # slice outlives the scan.
+    with map_file(args.core) as view:
+        vertex_sets, primitive_refs, stopped_early = load_core(
+            view, expected_primitives, use_numba=args.numba
+        )
 
+    if stopped_early:
+        # build_mapping only sees the primitives read so far, so its own
+        # count-mismatch warning cannot fire for the unread tail.
+        print(
+            f"[warn] stopped scanning .core after the {len(primitive_refs)} primitives "
+            "listed in the .dmf; the .core may hold more primitives than the .dmf"
+        )
     mapping = build_mapping(vertex_sets, primitive_refs, dmf_payload)
     output_path = args.output or args.core.with_suffix(args.core.suffix + ".streams.json")
-    output_path.write_text(json.dumps(mapping, indent=2, sort_keys=True))
+    if orjson is not None:
+        output_path.write_bytes(
+            orjson.dumps(mapping, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        )
+    else:
+        output_path.write_text(json.dumps(mapping, indent=2, sort_keys=True))
     print(f"Wrote stream mapping for {len(mapping)} primitives to {output_path}")
 
 